@@ -28,7 +28,7 @@ from cassandra.query import (
 from pydantic import BaseModel, Field
 
 from impl.model.assistant_object import AssistantObject
-from impl.model.assistant_object_tools_inner import AssistantObjectToolsInner
+from impl.model.assistant_object_tools_inner import ASSISTANT_TOOLS_ADAPTER, parse_tools_json
 from impl.model.message_object import MessageObject
 from impl.model.open_ai_file import OpenAIFile
 from impl.model.run_object import RunObject
@@ -64,6 +64,21 @@ Unauthorized to connect to AstraDB. Please ensure you're passing a token startin
 """
 
 
+def row_as_dict(row) -> Dict[str, Any]:
+    # Methods called from worker threads must not toggle session.row_factory,
+    # so rows may arrive either as dicts or as the default named tuples.
+    if isinstance(row, dict):
+        return row
+    return row._asdict()
+
+
+def assistant_tools_from_row(row: Dict[str, Any]):
+    # rows written before tools_json existed only have the legacy per-tool list
+    if row.get("tools_json") is not None:
+        return ASSISTANT_TOOLS_ADAPTER.validate_json(row["tools_json"])
+    return parse_tools_json(row["tools"])
+
+
 class Payload(BaseModel):
     args: Dict[str, Any]
 
@@ -151,12 +166,14 @@ class CassandraClient:
         self.token = token
         self.dbid = dbid
         self.session: Optional[Session] = None  # Initialize session to None
+        self._prepared_statements: Dict[str, PreparedStatement] = {}
 
     async def async_setup(self):
         if self.dbid is None:
             await self.get_or_create_db()
 
-        session = self.connect()
+        # connecting downloads the bundle and handshakes with the cluster, keep it off the event loop
+        session = await asyncio.to_thread(self.connect)
         if session:
             self.session: Session = session
             # Perform async table creation
@@ -175,7 +192,7 @@ class CassandraClient:
             "Content-Type": "application/json",
         }
 
-        response = requests.get(url, headers=headers, timeout=60)
+        response = await asyncio.to_thread(requests.get, url, headers=headers, timeout=60)
         handled_response = self.handle_response_errors(response)
         if handled_response is not None:
             logger.error(f"Failed to create AstraDBs {handled_response.detail}")
@@ -196,19 +213,19 @@ class CassandraClient:
                     self.dbid = database["id"]
                     await self.make_keyspace()
                     logger.info(f"Waking up hibernated db {database['id']}")
-                    time.sleep(5)
+                    await asyncio.sleep(5)
                     await self.get_or_create_db()
                     return
                 if status == "TERMINATING":
                     is_terminating = True
                 else:
-                    time.sleep(5)
+                    await asyncio.sleep(5)
                     logger.info(f"Waiting for {database['id']} to come up")
                     await self.get_or_create_db()
                     return
 
         if is_terminating:
-            time.sleep(5)
+            await asyncio.sleep(5)
             logger.info(f"Waiting for {database['id']} to terminate")
             await self.get_or_create_db()
             return
@@ -235,7 +252,7 @@ class CassandraClient:
         logger.info(f"{url = }")
         logger.info(f"{headers = }")
         logger.info(f"{payload = }")
-        response = requests.post(url, headers=headers, json=payload)
+        response = await asyncio.to_thread(requests.post, url, headers=headers, json=payload)
         handled_response = self.handle_response_errors(response)
         if handled_response is not None:
             logger.error(f"Failed to create AstraDBs {handled_response.detail}")
@@ -443,9 +460,12 @@ class CassandraClient:
             logger.info(f"Exception adding index for column: {e}")
 
     async def create_table(self):
-        try:
-            await self.make_keyspace()
+        await self.make_keyspace()
+        # the DDL below is synchronous driver work, keep it off the event loop
+        await asyncio.to_thread(self._create_tables)
 
+    def _create_tables(self):
+        try:
             self.session.execute(f"""
             create table if not exists {CASSANDRA_KEYSPACE}.assistants (
                 id text primary key,
@@ -460,6 +480,14 @@ class CassandraClient:
                 object text
             );"""
             )
+            # tools used to be stored as list<text> with one JSON document per tool,
+            # tools_json holds the whole array as a single document
+            try:
+                self.session.execute(
+                    f"""alter TABLE {CASSANDRA_KEYSPACE}.assistants ADD tools_json text;"""
+                )
+            except Exception as e:
+                logger.info(f"alter table attempt: {e}")
 
 
             self.session.execute(f"""
@@ -708,8 +736,7 @@ class CassandraClient:
         DELETE FROM {CASSANDRA_KEYSPACE}.assistants WHERE id = ?;  
         """
 
-        statement = self.session.prepare(query_string)
-        statement.consistency_level = ConsistencyLevel.QUORUM
+        statement = self.prepare_cached(query_string)
         bound = statement.bind((id,))
         response = self.session.execute(bound)
         return True
@@ -812,11 +839,7 @@ class CassandraClient:
         json_rows = result[0]
         self.session.row_factory = named_tuple_factory
 
-        toolsJson = json_rows["tools"]
-        tools = []
-        if toolsJson is not None:
-            for json_string in toolsJson:
-                tools.append(AssistantObjectToolsInner.parse_raw(json_string))
+        tools = parse_tools_json(json_rows["tools"])
 
         metadata = json_rows["metadata"]
         if metadata is None:
@@ -869,23 +892,16 @@ class CassandraClient:
         SELECT * FROM {CASSANDRA_KEYSPACE}.assistants WHERE id = ?;  
         """
 
-        statement = self.session.prepare(query_string)
-        statement.consistency_level = ConsistencyLevel.QUORUM
-        self.session.row_factory = dict_factory
+        statement = self.prepare_cached(query_string)
         bound = statement.bind((id,))
         rows = self.session.execute(bound)
-        result = [dict(row) for row in rows]
+        result = [row_as_dict(row) for row in rows]
         if result is None or len(result) == 0:
             return None
         json_row = result[0]
         logger.info(f"fetched this row: {json_row}")
-        self.session.row_factory = named_tuple_factory
 
-        toolsJson = json_row["tools"]
-        tools = []
-        if toolsJson is not None:
-            for json_string in toolsJson:
-                tools.append(AssistantObjectToolsInner.parse_raw(json_string))
+        tools = assistant_tools_from_row(json_row)
 
         metadata = json_row["metadata"]
         if metadata is None:
@@ -1458,6 +1474,7 @@ class CassandraClient:
             model,
             instructions,
             tools,
+            tools_json,
             file_ids,
             metadata,
             object,
@@ -1473,9 +1490,10 @@ class CassandraClient:
                     file_ids,
                     metadata,
                     object,
-                    tools
+                    tools,
+                    tools_json
             ) VALUES (
-            ?, ?, ?, ?, ?, ?, ?, ?, ?, ? 
+            ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?
             );"""
 
         if name is None:
@@ -1487,12 +1505,11 @@ class CassandraClient:
         if model is None:
             model = UNSET_VALUE
 
-        toolsJson = []
-        for tool in tools:
-            toolsJson.append(tool.json())
+        # keep writing the legacy per-tool list so readers that predate tools_json
+        # (older workers during a rolling deploy, rollbacks) still see the tools
+        legacy_tools = [tool.model_dump_json() for tool in tools]
 
-        statement = self.session.prepare(query_string)
-        statement.consistency_level = ConsistencyLevel.QUORUM
+        statement = self.prepare_cached(query_string)
         try:
             response = self.session.execute(
                 statement,
@@ -1506,7 +1523,8 @@ class CassandraClient:
                     file_ids,
                     metadata,
                     object,
-                    toolsJson
+                    legacy_tools,
+                    tools_json
                 ),
             )
         except Exception as e:
@@ -1532,6 +1550,37 @@ class CassandraClient:
         self.session.row_factory = named_tuple_factory
         return json_rows
 
+    def prepare_cached(self, query_string: str) -> PreparedStatement:
+        """Prepare a statement once per client and reuse it on later calls."""
+        statement = self._prepared_statements.get(query_string)
+        if statement is None:
+            statement = self.session.prepare(query_string)
+            statement.consistency_level = ConsistencyLevel.QUORUM
+            self._prepared_statements[query_string] = statement
+        return statement
+
+    def selectPageFromTable(self, table: str, limit: int = 20, after_id: str = None):
+        """Fetch one page of a table keyed by `id`, using the partition token as the cursor.
+
+        The table is partitioned by id, so rows can only be walked forwards in token order;
+        `after_id` starts the page after the token of the given id.
+        One extra row is requested so `has_more` comes for free.
+        Returns (rows, has_more).
+        """
+        query_string = f"""SELECT * FROM {CASSANDRA_KEYSPACE}.{table}"""
+        args = []
+        if after_id is not None:
+            query_string += " WHERE token(id) > token(?)"
+            args.append(after_id)
+        query_string += " LIMIT ?;"
+        args.append(limit + 1)
+
+        statement = self.prepare_cached(query_string)
+        rows = self.session.execute(statement, tuple(args))
+        json_rows = [row_as_dict(row) for row in rows]
+        has_more = len(json_rows) > limit
+        return json_rows[:limit], has_more
+
     def select_from_table_by_pk(self, table: str, partition_keys: List[str], args: Dict[str, Any], limit: int = None,
                                 order: str = None, allow_filtering: bool = False) -> object:
         limit_string = ""
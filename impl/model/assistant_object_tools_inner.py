@@ -6,7 +6,7 @@ from datetime import date, datetime  # noqa: F401
 import re  # noqa: F401
 from typing import Any, Dict, List, Optional  # noqa: F401
 
-from pydantic import AnyUrl, BaseModel, EmailStr, Field, validator  # noqa: F401
+from pydantic import AnyUrl, BaseModel, EmailStr, Field, TypeAdapter, validator  # noqa: F401
 from openapi_server.models.assistant_tools_code import AssistantToolsCode
 from openapi_server.models.assistant_tools_function import AssistantToolsFunction
 from openapi_server.models.assistant_tools_retrieval import AssistantToolsRetrieval
@@ -36,4 +36,19 @@ class AssistantObjectToolsInner(BaseModel):
         )
         return _dict
 
-AssistantObjectToolsInner.update_forward_refs()
\ No newline at end of file
+AssistantObjectToolsInner.update_forward_refs()
+
+# Validates a whole list of tools in one pass instead of one parse per tool
+ASSISTANT_TOOLS_ADAPTER = TypeAdapter(List[AssistantObjectToolsInner])
+
+
+def parse_tools_json(tools_json: Optional[List[str]]) -> List[AssistantObjectToolsInner]:
+    """Parse tools stored as one JSON document per tool."""
+    if not tools_json:
+        return []
+    return ASSISTANT_TOOLS_ADAPTER.validate_json("[" + ",".join(tools_json) + "]")
+
+
+def dump_tools_json(tools: List[AssistantObjectToolsInner]) -> str:
+    """Serialize a list of tools as the single JSON document stored in tools_json."""
+    return ASSISTANT_TOOLS_ADAPTER.dump_json(tools).decode()
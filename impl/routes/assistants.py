@@ -1,64 +1,143 @@
 import asyncio
 import time
 import logging
-from datetime import datetime
-from uuid import uuid1
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import uuid4
 from fastapi import APIRouter, Body, Depends, Path, Query, HTTPException
-from impl.astra_vector import CassandraClient
+from fastapi.responses import ORJSONResponse
+from impl.astra_vector import CassandraClient, assistant_tools_from_row
 from openapi_server.models.delete_assistant_response import DeleteAssistantResponse
 from openapi_server.models.list_assistants_response import ListAssistantsResponse
 
 from .utils import verify_db_client, verify_openai_token
 from ..model.assistant_object import AssistantObject
-from ..model.assistant_object_tools_inner import AssistantObjectToolsInner
+from ..model.assistant_object_tools_inner import AssistantObjectToolsInner, dump_tools_json
 from ..model.create_assistant_request import CreateAssistantRequest
 from ..model.modify_assistant_request import ModifyAssistantRequest
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
 
 logger = logging.getLogger(__name__)
 
-@router.get(
-    "/assistants",
-    responses={
-        200: {"model": ListAssistantsResponse, "description": "OK"},
-    },
-    tags=["Assistants"],
-    summary="Returns a list of assistants.",
-    response_model_by_alias=True,
+# Whole list_assistants responses, keyed by (astradb, limit, order, after)
+# -> (expires_at, response). Writes bump the generation so a read that was
+# already in flight does not store a stale result.
+LIST_CACHE_TTL_SECONDS = 5
+LIST_CACHE_MAX_ENTRIES = 256
+_list_cache: Dict[tuple, Tuple[float, ListAssistantsResponse]] = {}
+_list_locks: Dict[tuple, asyncio.Lock] = {}
+_list_lock_users: Dict[tuple, int] = {}
+_cache_generation = 0
+
+# Next pages of list_assistants queried ahead of the client asking for them,
+# keyed by (astradb, after, limit) -> (expires_at, task). Writes only clear the
+# worker that handled them, so a prefetched page must not outlive a cached list.
+PREFETCH_TTL_SECONDS = LIST_CACHE_TTL_SECONDS
+PREFETCH_MAX_ENTRIES = 128
+_prefetched_pages: Dict[tuple, Tuple[float, asyncio.Task]] = {}
+
+# Single assistants by (astradb, assistant_id) -> (expires_at, assistant).
+# Writes only invalidate the worker that handled them, so keep the TTL as short as the list cache.
+ASSISTANT_CACHE_TTL_SECONDS = 5
+ASSISTANT_CACHE_MAX_ENTRIES = 1024
+_assistant_cache: Dict[tuple, Tuple[float, AssistantObject]] = {}
+
+MODIFY_READ_ATTEMPTS = 5
+
+_EMPTY_LIST_RESPONSE = ListAssistantsResponse(
+    data=[],
+    object="assistant",
+    first_id="none",
+    last_id="none",
+    has_more=False,
 )
-async def list_assistants(
-    limit: int = Query(
-        20,
-        description="A limit on the number of objects to be returned. Limit can range between 1 and 100, and the default is 20. ",
-    ),
-    order: str = Query(
-        "desc",
-        description="Sort order by the &#x60;created_at&#x60; timestamp of the objects. &#x60;asc&#x60; for ascending order and &#x60;desc&#x60; for descending order. ",
-    ),
-    after: str = Query(
-        None,
-        description="A cursor for use in pagination. &#x60;after&#x60; is an object ID that defines your place in the list. For instance, if you make a list request and receive 100 objects, ending with obj_foo, your subsequent call can include after&#x3D;obj_foo in order to fetch the next page of the list. ",
-    ),
-    before: str = Query(
-        None,
-        description="A cursor for use in pagination. &#x60;before&#x60; is an object ID that defines your place in the list. For instance, if you make a list request and receive 100 objects, ending with obj_foo, your subsequent call can include before&#x3D;obj_foo in order to fetch the previous page of the list. ",
-    ),
-    openai_token: str = Depends(verify_openai_token),
-    astradb: CassandraClient = Depends(verify_db_client),
+
+
+def _pop_prefetched_page(key: tuple) -> Optional[asyncio.Task]:
+    entry = _prefetched_pages.pop(key, None)
+    if entry is None:
+        return None
+    expires_at, task = entry
+    if expires_at < time.monotonic():
+        return None
+    return task
+
+
+def _prefetch_page(astradb: CassandraClient, limit: int, after: str) -> None:
+    key = (astradb, after, limit)
+    if key in _prefetched_pages:
+        return
+    while len(_prefetched_pages) >= PREFETCH_MAX_ENTRIES:
+        _prefetched_pages.pop(next(iter(_prefetched_pages)))
+    task = asyncio.create_task(
+        asyncio.to_thread(astradb.selectPageFromTable, table="assistants", limit=limit, after_id=after)
+    )
+    # nobody may ever await this task, retrieve the exception so it is not reported as lost
+    task.add_done_callback(lambda t: t.cancelled() or t.exception())
+    _prefetched_pages[key] = (time.monotonic() + PREFETCH_TTL_SECONDS, task)
+
+
+def _cache_get(cache: Dict[tuple, Tuple[float, Any]], key: tuple) -> Any:
+    entry = cache.get(key)
+    if entry is None:
+        return None
+    expires_at, value = entry
+    if expires_at < time.monotonic():
+        cache.pop(key, None)
+        return None
+    return value
+
+
+def _cache_put(cache: Dict[tuple, Tuple[float, Any]], key: tuple, value: Any, ttl: float, max_entries: int) -> None:
+    cache.pop(key, None)
+    while len(cache) >= max_entries:
+        cache.pop(next(iter(cache)))
+    cache[key] = (time.monotonic() + ttl, value)
+
+
+def _invalidate_caches(assistant_id: Optional[str] = None) -> None:
+    global _cache_generation
+    _cache_generation += 1
+    _list_cache.clear()
+    _prefetched_pages.clear()
+    if assistant_id is not None:
+        # other tokens on the same database have their own client, drop their copies too
+        for key in [key for key in _assistant_cache if key[1] == assistant_id]:
+            _assistant_cache.pop(key, None)
+
+
+def _normalize_assistant_fields(
+    request: CreateAssistantRequest | ModifyAssistantRequest,
+) -> Tuple[Dict[str, Any], List[str], List[AssistantObjectToolsInner], str]:
+    """Return (metadata, file_ids, tools, description) with missing values replaced by empty defaults."""
+    return (
+        request.metadata or {},
+        request.file_ids or [],
+        request.tools or [],
+        request.description or "",
+    )
+
+
+async def _load_assistants_page(
+    astradb: CassandraClient, limit: int, after: Optional[str]
 ) -> ListAssistantsResponse:
-    raw_assistants = astradb.selectAllFromTable(table="assistants")
+    raw_assistants = None
+    prefetched = _pop_prefetched_page((astradb, after, limit))
+    if prefetched is not None:
+        try:
+            raw_assistants, has_more = await prefetched
+        except Exception as e:
+            logger.warning("prefetched assistants page failed, querying again: %s", e)
+    if raw_assistants is None:
+        raw_assistants, has_more = await asyncio.to_thread(
+            astradb.selectPageFromTable, table="assistants", limit=limit, after_id=after
+        )
 
-    assistants = []
     if len(raw_assistants) == 0:
-        return ListAssistantsResponse(
-            data=assistants,
-            object="assistant",
-            first_id="none",
-            last_id="none",
-            has_more=False,
-        )
-    for assistant in raw_assistants:
+        return _EMPTY_LIST_RESPONSE
+
+    assistants = [None] * len(raw_assistants)
+    for i, assistant in enumerate(raw_assistants):
         created_at = int(assistant["created_at"].timestamp() * 1000)
 
         metadata = assistant["metadata"]
@@ -69,17 +148,13 @@ async def list_assistants(
         if file_ids is None:
             file_ids = []
 
-        toolsJson = assistant["tools"]
-        tools = []
-
-        if toolsJson is not None:
-            for json_string in toolsJson:
-                tools.append(AssistantObjectToolsInner.parse_raw(json_string))
+        tools = assistant_tools_from_row(assistant)
 
         if assistant["model"] is None:
-            logger.info(f'Model is required, assistant={assistant}, assistant["model"]={assistant["model"]}')
+            logger.info('Model is required, assistant=%s, assistant["model"]=%s', assistant, assistant["model"])
 
-        assistant = AssistantObject(
+        # rows were validated when they were written, skip validation on the way out
+        assistants[i] = AssistantObject.model_construct(
             id=assistant["id"],
             object="assistant",
             created_at=created_at,
@@ -91,16 +166,79 @@ async def list_assistants(
             file_ids=file_ids,
             metadata=metadata,
         )
-        assistants.append(assistant)
-    first_id = raw_assistants[0]["id"]
-    last_id = raw_assistants[len(raw_assistants) - 1]["id"]
+    first_id = assistants[0].id
+    last_id = assistants[-1].id
     assistants_response = ListAssistantsResponse(
         data=assistants,
         object="assistants",
         first_id=first_id,
         last_id=last_id,
-        has_more=False,
+        has_more=has_more,
     )
+    # only clients already walking the cursor are likely to ask for the next page soon
+    if has_more and after is not None:
+        _prefetch_page(astradb, limit, last_id)
+    return assistants_response
+
+
+@router.get(
+    "/assistants",
+    responses={
+        200: {"model": ListAssistantsResponse, "description": "OK"},
+    },
+    tags=["Assistants"],
+    summary="Returns a list of assistants.",
+    response_model_by_alias=True,
+)
+async def list_assistants(
+    limit: int = Query(
+        20,
+        description="A limit on the number of objects to be returned. Limit can range between 1 and 100, and the default is 20. ",
+        ge=1,
+        le=100,
+    ),
+    order: str = Query(
+        "desc",
+        description="Sort order by the &#x60;created_at&#x60; timestamp of the objects. &#x60;asc&#x60; for ascending order and &#x60;desc&#x60; for descending order. ",
+    ),
+    after: str = Query(
+        None,
+        description="A cursor for use in pagination. &#x60;after&#x60; is an object ID that defines your place in the list. For instance, if you make a list request and receive 100 objects, ending with obj_foo, your subsequent call can include after&#x3D;obj_foo in order to fetch the next page of the list. ",
+    ),
+    before: str = Query(
+        None,
+        description="A cursor for use in pagination. &#x60;before&#x60; is an object ID that defines your place in the list. For instance, if you make a list request and receive 100 objects, ending with obj_foo, your subsequent call can include before&#x3D;obj_foo in order to fetch the previous page of the list. ",
+    ),
+    openai_token: str = Depends(verify_openai_token),
+    astradb: CassandraClient = Depends(verify_db_client),
+) -> ListAssistantsResponse:
+    # CQL can only walk the token ring forwards, so there is no cheap way to page backwards
+    if before is not None:
+        raise HTTPException(status_code=400, detail="Before is not supported. Please file an issue at github.com/datastax/astra-assistants-api/issues")
+
+    key = (astradb, limit, order, after)
+    cached = _cache_get(_list_cache, key)
+    if cached is not None:
+        return cached
+
+    # only one request per key goes to the database on a cold cache, the lock is
+    # dropped once the last request holding or waiting on it is done
+    lock = _list_locks.setdefault(key, asyncio.Lock())
+    _list_lock_users[key] = _list_lock_users.get(key, 0) + 1
+    try:
+        async with lock:
+            cached = _cache_get(_list_cache, key)
+            if cached is not None:
+                return cached
+            generation = _cache_generation
+            assistants_response = await _load_assistants_page(astradb, limit, after)
+            if generation == _cache_generation:
+                _cache_put(_list_cache, key, assistants_response, LIST_CACHE_TTL_SECONDS, LIST_CACHE_MAX_ENTRIES)
+    finally:
+        _list_lock_users[key] -= 1
+        if _list_lock_users[key] == 0:
+            del _list_lock_users[key]
+            _list_locks.pop(key, None)
     return assistants_response
 
 
@@ -118,32 +256,17 @@ async def create_assistant(
     openai_token: str = Depends(verify_openai_token),
     astradb: CassandraClient = Depends(verify_db_client),
 ) -> AssistantObject:
-    assistant_id = str(uuid1())
-    logging.info(f"going to create assistant with id: {assistant_id} and details {create_assistant_request}")
-    metadata = create_assistant_request.metadata
-    if metadata is None:
-        metadata = {}
-
-    file_ids = create_assistant_request.file_ids
-    if file_ids is None:
-        file_ids = []
-
-    tools = create_assistant_request.tools
-    if tools is None:
-        tools = []
-
-    retrieval_tool = AssistantObjectToolsInner(type='retrieval', function=None)
-    if file_ids is not None and retrieval_tool not in tools and file_ids != []:
+    assistant_id = str(uuid4())
+    logger.info("going to create assistant with id: %s and details %s", assistant_id, create_assistant_request)
+    metadata, file_ids, tools, description = _normalize_assistant_fields(create_assistant_request)
+
+    if file_ids and not any(tool.type == 'retrieval' for tool in tools):
         # raise http error
         raise HTTPException(status_code=400, detail="Retrieval tool is required when file_ids is not [].")
 
-
-    description = create_assistant_request.description
-    if description is None:
-        description = ""
-
-    created_at = int(time.mktime(datetime.now().timetuple()))
-    astradb.upsert_assistant(
+    created_at = int(time.time())
+    await asyncio.to_thread(
+        astradb.upsert_assistant,
         id=assistant_id,
         created_at=created_at,
         name=create_assistant_request.name,
@@ -151,11 +274,13 @@ async def create_assistant(
         model=create_assistant_request.model,
         instructions=create_assistant_request.instructions,
         tools=tools,
+        tools_json=dump_tools_json(tools),
         file_ids=file_ids,
         metadata=metadata,
         object="assistant",
     )
-    logging.info(f"created assistant with id: {assistant_id}")
+    _invalidate_caches()
+    logger.info("created assistant with id: %s", assistant_id)
 
     name = create_assistant_request.name
     if name is None:
@@ -173,7 +298,7 @@ async def create_assistant(
         metadata=metadata,
         object="assistant",
     )
-    logging.info(f"with these details: {updated_assistant}")
+    logger.info("with these details: %s", updated_assistant)
     return updated_assistant
 
 
@@ -184,44 +309,65 @@ async def modify_assistant(
     openai_token: str = Depends(verify_openai_token),
     astradb: CassandraClient = Depends(verify_db_client),
 ) -> AssistantObject:
-    metadata = modify_assistant_request.metadata
-    if metadata is None:
-        metadata = {}
-
-    file_ids = modify_assistant_request.file_ids
-    if file_ids is None:
-        file_ids = []
-
-    tools = modify_assistant_request.tools
-    if tools is None:
-        tools = []
-
-    description = modify_assistant_request.description
-    if description is None:
-        description = ""
-
-    assistant = astradb.get_assistant(id=assistant_id)
+    metadata, file_ids, tools, description = _normalize_assistant_fields(modify_assistant_request)
+
+    # read the row fresh, the response falls back to its name, model and instructions.
+    # a freshly created assistant may not be readable yet, back off briefly before giving up
+    assistant = None
+    for attempt in range(MODIFY_READ_ATTEMPTS):
+        if attempt > 0:
+            logger.warning("assistant %s not found, retrying", assistant_id)
+            await asyncio.sleep(0.1 * (2 ** (attempt - 1)))
+        assistant = await asyncio.to_thread(astradb.get_assistant, id=assistant_id)
+        if assistant is not None:
+            break
     if assistant is None:
-        logger.warn(f"this should not happen")
-        asyncio.sleep(1)
-        return modify_assistant(assistant_id, modify_assistant_request, openai_token, astradb)
-    logger.info(f'assistant before upsert: {assistant}')
+        raise HTTPException(status_code=404, detail="Assistant not found.")
+    logger.info('assistant before upsert: %s', assistant)
 
-    astradb.upsert_assistant(
+    created_at = int(time.time())
+    await asyncio.to_thread(
+        astradb.upsert_assistant,
         id=assistant_id,
-        created_at=int(time.mktime(datetime.now().timetuple())),
+        created_at=created_at,
         name=modify_assistant_request.name,
         description=description,
         model=modify_assistant_request.model,
         instructions=modify_assistant_request.instructions,
         tools=tools,
+        tools_json=dump_tools_json(tools),
         file_ids=file_ids,
         metadata=metadata,
         object="assistant",
     )
+    _invalidate_caches(assistant_id)
+
+    # name, model and instructions are written as UNSET when missing, so the row keeps its old values
+    name = modify_assistant_request.name
+    if name is None:
+        name = assistant.name
 
-    assistant = astradb.get_assistant(id=assistant_id)
-    logger.info(f'assistant upserted: {assistant}')
+    model = modify_assistant_request.model
+    if model is None:
+        model = assistant.model
+
+    instructions = modify_assistant_request.instructions
+    if instructions is None:
+        instructions = assistant.instructions
+
+    assistant = AssistantObject.model_construct(
+        id=assistant_id,
+        created_at=created_at,
+        name=name,
+        description=description,
+        model=model,
+        instructions=instructions,
+        tools=tools,
+        file_ids=file_ids,
+        metadata=metadata,
+        object="assistant",
+    )
+    logger.info('assistant upserted: %s', assistant)
     return assistant
 
 
@@ -239,7 +385,8 @@ async def delete_assistant(
     openai_token: str = Depends(verify_openai_token),
     astradb: CassandraClient = Depends(verify_db_client),
 ) -> DeleteAssistantResponse:
-    astradb.delete_assistant(id=assistant_id)
+    await asyncio.to_thread(astradb.delete_assistant, id=assistant_id)
+    _invalidate_caches(assistant_id)
     return DeleteAssistantResponse(
         id=str(assistant_id), deleted=True, object="assistant"
     )
@@ -259,7 +406,14 @@ async def get_assistant(
     openai_token: str = Depends(verify_openai_token),
     astradb: CassandraClient = Depends(verify_db_client),
 ) -> AssistantObject:
-    assistant = astradb.get_assistant(id=assistant_id)
+    key = (astradb, assistant_id)
+    assistant = _cache_get(_assistant_cache, key)
+    if assistant is not None:
+        return assistant
+    generation = _cache_generation
+    assistant = await asyncio.to_thread(astradb.get_assistant, id=assistant_id)
     if assistant is None:
         raise HTTPException(status_code=404, detail="Assistant not found.")
+    if generation == _cache_generation:
+        _cache_put(_assistant_cache, key, assistant, ASSISTANT_CACHE_TTL_SECONDS, ASSISTANT_CACHE_MAX_ENTRIES)
     return assistant
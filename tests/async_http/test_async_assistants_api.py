@@ -1,7 +1,9 @@
+import asyncio
 import contextlib
 import io
 import logging
 import os
+import time
 
 import pytest
 from dotenv import load_dotenv
@@ -11,6 +13,7 @@ from litellm import utils
 from impl.main import app
 from impl.model.create_run_request import CreateRunRequest
 from impl.model.run_object import RunObject
+from impl.routes import assistants
 from openapi_server.models.assistant_object import AssistantObject
 from openapi_server.models.create_assistant_request import CreateAssistantRequest
 from openapi_server.models.create_thread_and_run_request import CreateThreadAndRunRequest
@@ -187,4 +190,28 @@ async def test_streaming_run():
 #
 #        logger.info(response)
 #        # uncomment below to assert the status code of the HTTP response
-#        assert response.status_code == 200
\ No newline at end of file
+#        assert response.status_code == 200
+
+
+class CountingPageClient:
+    """Stands in for CassandraClient and counts how often a page is queried."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def selectPageFromTable(self, table, limit=20, after_id=None):
+        self.calls += 1
+        time.sleep(0.2)
+        return [], False
+
+
+@pytest.mark.asyncio
+async def test_list_assistants_cold_cache_queries_once():
+    astradb = CountingPageClient()
+    responses = await asyncio.gather(*[
+        assistants.list_assistants(limit=20, order="desc", after=None, before=None, openai_token=None, astradb=astradb)
+        for _ in range(5)
+    ])
+    assert astradb.calls == 1
+    assert all(response.data == [] for response in responses)
+    assert assistants._list_locks == {}
@@ -366,6 +366,46 @@ def test_list_assistants(client: TestClient):
     assert response.status_code == 200
 
 
+def test_list_assistants_pagination(client: TestClient):
+    """Test case for list_assistants
+
+    Pages through assistants one at a time using the after cursor.
+    """
+    test_create_assistant(client)
+    test_create_assistant(client)
+    headers = get_headers(MODEL)
+    response = client.request(
+        "GET",
+        "/assistants",
+        headers=headers,
+        params=[("limit", 1)],
+    )
+    assert response.status_code == 200
+    first_page = ListAssistantsResponse.parse_raw(response.content)
+    assert len(first_page.data) == 1
+    assert first_page.has_more
+
+    response = client.request(
+        "GET",
+        "/assistants",
+        headers=headers,
+        params=[("limit", 1), ("after", first_page.last_id)],
+    )
+    assert response.status_code == 200
+    second_page = ListAssistantsResponse.parse_raw(response.content)
+    assert len(second_page.data) == 1
+    assert second_page.data[0].id != first_page.data[0].id
+
+    # paging backwards is not supported by the token based cursor
+    response = client.request(
+        "GET",
+        "/assistants",
+        headers=headers,
+        params=[("limit", 1), ("before", second_page.first_id)],
+    )
+    assert response.status_code == 400
+
+
 @pytest.mark.skip(reason="Not implemented")
 def test_list_message_files(client: TestClient):
     """Test case for list_message_files